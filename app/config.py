@@ -9,15 +9,64 @@ class Config:
     
     # MongoDB settings
     MONGO_URI = os.environ.get('MONGO_URI') or 'mongodb://localhost:27017/drawed'
+
+    # MongoDB connection pool settings (one shared client per process)
+    MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 50))
+    MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 300000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 10000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 20000))
+    # Wire compression, e.g. 'zstd,snappy,zlib'. Empty disables it, which is
+    # best when mongod runs on the same host (e.g. the Raspberry Pi)
+    MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', '')
+    MONGO_ZLIB_COMPRESSION_LEVEL = int(os.environ.get('MONGO_ZLIB_COMPRESSION_LEVEL', 6))
     
     # Flask-SocketIO settings
     SOCKETIO_ASYNC_MODE = 'eventlet'  # 'eventlet', 'gevent', or None for threading (less performant)
+    # Share broadcasts between workers through a capped collection in this
+    # MongoDB (e.g. the same URI as MONGO_URI). None keeps them in-process.
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+    SOCKETIO_MESSAGE_QUEUE_CHANNEL = 'socketio'
+    SOCKETIO_MESSAGE_QUEUE_SIZE = 16 * 1024 * 1024  # bytes in the capped collection
+    SOCKETIO_MESSAGE_QUEUE_BATCH_INTERVAL = 0.01  # seconds to gather publishes
+    # Stable name for this worker so it can resume its cursor after a restart
+    SOCKETIO_NODE_ID = os.environ.get('SOCKETIO_NODE_ID')
     
     # Application specific settings
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'artworks')
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max upload size
 
+    # In-memory artwork catalog used for random picks
+    ARTWORK_CATALOG_TTL = int(os.environ.get('ARTWORK_CATALOG_TTL', 300))  # seconds
+    ARTWORK_CATALOG_PRELOAD = True  # Load the catalog when the app starts
+    ARTWORK_CATALOG_WATCH = True  # Expire the catalog from a change stream when available
+
+    # Per-process LRU of user profiles used to build broadcasts
+    USER_PROFILE_CACHE_SIZE = int(os.environ.get('USER_PROFILE_CACHE_SIZE', 1024))
+    USER_PROFILE_CACHE_TTL = int(os.environ.get('USER_PROFILE_CACHE_TTL', 60))  # seconds
+
+    # Guest identities (signed tokens, user documents written on first art)
+    GUEST_TOKEN_MAX_AGE = 30 * 24 * 3600  # seconds
+    GUEST_WRITE_BATCH_SIZE = 100
+    GUEST_WRITE_INTERVAL = 1.0  # seconds between bulk flushes
+
+    # Coalesced mark_seen writes
+    MARK_SEEN_BATCH_SIZE = 500  # Buffered (message, user) pairs before a flush
+    MARK_SEEN_FLUSH_INTERVAL = 1.0  # seconds between bulk flushes
+    MARK_SEEN_BATCH_MAX_IDS = 200  # Message IDs accepted per mark_seen_batch event
+
+    # Chat history pages
+    HISTORY_PAGE_SIZE = 50
+    HISTORY_MAX_LIMIT = 100
+
+    # Create model indexes when the app starts
+    MONGO_ENSURE_INDEXES = True
+    # Flush buffered bulk writes from background tasks
+    BULK_WRITE_BACKGROUND_FLUSH = True
+
 class DevelopmentConfig(Config):
     DEBUG = True
     # You might want specific MongoDB for development
@@ -27,11 +76,17 @@ class TestingConfig(Config):
     TESTING = True
     # Use a separate test database
     MONGO_URI = os.environ.get('TEST_MONGO_URI') or 'mongodb://localhost:27017/drawed_test'
+    # Tests create artworks after startup, so load the catalog on demand
+    ARTWORK_CATALOG_PRELOAD = False
+    ARTWORK_CATALOG_WATCH = False
+    # Tests flush buffered writes explicitly
+    BULK_WRITE_BACKGROUND_FLUSH = False
 
 class ProductionConfig(Config):
     # In production, all secrets should come from environment variables
     SECRET_KEY = os.environ.get('SECRET_KEY')
     MONGO_URI = os.environ.get('MONGO_URI')
+    MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', 'zlib')
     
     # Production might use a different SocketIO mode for better performance
     SOCKETIO_ASYNC_MODE = 'eventlet'
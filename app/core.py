@@ -9,18 +9,41 @@ def create_app(config_name='default'):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
 
+    # Import socket events before init_app so their handlers are recorded on
+    # the SocketIO object and replayed onto every server it creates
+    from app.sockets import events
+
     # Initialize extensions
-    socketio.init_app(app, cors_allowed_origins="*")
+    socketio_options = {'cors_allowed_origins': "*"}
+    if app.config['SOCKETIO_MESSAGE_QUEUE']:
+        # Fan broadcasts out to the other workers through MongoDB
+        from app.sockets.manager import MongoManager
+        socketio_options['client_manager'] = MongoManager(
+            app.config['SOCKETIO_MESSAGE_QUEUE'],
+            channel=app.config['SOCKETIO_MESSAGE_QUEUE_CHANNEL'],
+            collection_size=app.config['SOCKETIO_MESSAGE_QUEUE_SIZE'],
+            batch_interval=app.config['SOCKETIO_MESSAGE_QUEUE_BATCH_INTERVAL'],
+            node_id=app.config['SOCKETIO_NODE_ID']
+        )
+    socketio.init_app(app, **socketio_options)
 
     # Initialize database
     from app import database
     database.init_app(app)
 
+    # Create indexes and register the `flask db` commands
+    from app import schema
+    schema.init_app(app)
+
+    # Initialize services
+    from app.services import catalog, guests, profiles, seen
+    catalog.init_app(app)
+    profiles.init_app(app)
+    guests.init_app(app)
+    seen.init_app(app)
+
     # Register blueprints
     from app.routes.views import views_bp
     app.register_blueprint(views_bp)
 
-    # Import socket events
-    from app.sockets import events
-
     return app
@@ -1,29 +1,195 @@
+import os
+import threading
+
 from flask import current_app, g
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
+
+_client_lock = threading.Lock()
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener that keeps running counters for the shared client.
+
+    Counters:
+    - checkouts: Connections handed out to operations
+    - checkout_failures: Checkouts that timed out or hit a closed pool
+    - waits: Checkouts that started while every pooled connection was busy
+    - wait_time_ms: Total time spent waiting for a connection
+    - in_use: Connections currently checked out
+    - open: Connections currently open (idle + in use)
+    - created / closed: Connections opened and closed since startup
+    - pool_clears: Times the pool was cleared after a network error
+    """
+
+    def __init__(self, max_pool_size=None):
+        self.max_pool_size = max_pool_size
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.waits = 0
+        self.wait_time_ms = 0.0
+        self.in_use = 0
+        self.open = 0
+        self.created = 0
+        self.closed = 0
+        self.pool_clears = 0
+
+    def snapshot(self):
+        """Return the current counters as a plain dict"""
+        with self._lock:
+            return {
+                'max_pool_size': self.max_pool_size,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'waits': self.waits,
+                'wait_time_ms': round(self.wait_time_ms, 3),
+                'in_use': self.in_use,
+                'open': self.open,
+                'idle': max(self.open - self.in_use, 0),
+                'created': self.created,
+                'closed': self.closed,
+                'pool_clears': self.pool_clears,
+                'pid': os.getpid()
+            }
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.created += 1
+            self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.closed += 1
+            self.open = max(self.open - 1, 0)
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            if self.max_pool_size and self.in_use >= self.max_pool_size:
+                self.waits += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            duration = getattr(event, 'duration', None)
+            if duration:
+                self.wait_time_ms += duration * 1000
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+
+def _client_options(config, pool_stats):
+    """Build MongoClient keyword arguments from the app config"""
+    options = {
+        'maxPoolSize': config['MONGO_MAX_POOL_SIZE'],
+        'minPoolSize': config['MONGO_MIN_POOL_SIZE'],
+        'maxIdleTimeMS': config['MONGO_MAX_IDLE_TIME_MS'],
+        'waitQueueTimeoutMS': config['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+        'connectTimeoutMS': config['MONGO_CONNECT_TIMEOUT_MS'],
+        'serverSelectionTimeoutMS': config['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+        'socketTimeoutMS': config['MONGO_SOCKET_TIMEOUT_MS'],
+        # Don't open sockets until the first operation: the client may be
+        # created before eventlet monkey-patching or before a pre-fork server
+        # forks its workers
+        'connect': False,
+        'event_listeners': [pool_stats]
+    }
+    if config.get('MONGO_COMPRESSORS'):
+        options['compressors'] = config['MONGO_COMPRESSORS']
+        options['zlibCompressionLevel'] = config['MONGO_ZLIB_COMPRESSION_LEVEL']
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def _create_client(app):
+    """Create the process-wide client for an app and store it in app.extensions"""
+    pool_stats = PoolStats(app.config['MONGO_MAX_POOL_SIZE'])
+    client = MongoClient(
+        app.config['MONGO_URI'],
+        **_client_options(app.config, pool_stats)
+    )
+    app.extensions['mongo'] = {
+        'client': client,
+        'pid': os.getpid(),
+        'pool_stats': pool_stats
+    }
+    return client
+
+
+def get_client(app=None):
+    """
+    Return the shared MongoClient for the app.
+    A client inherited across fork() is replaced by a fresh one, since
+    pymongo clients are not fork-safe.
+    """
+    app = app or current_app._get_current_object()
+    state = app.extensions.get('mongo')
+    if state is None or state['pid'] != os.getpid():
+        with _client_lock:
+            state = app.extensions.get('mongo')
+            if state is None or state['pid'] != os.getpid():
+                return _create_client(app)
+    return state['client']
 
 
 def get_db():
     """
-    Configure and return the MongoDB client.
+    Return the default database of the shared MongoDB client.
     Uses the application's MONGO_URI config value.
     """
     if 'db' not in g:
-        client = MongoClient(current_app.config['MONGO_URI'])
-        g.db = client.get_default_database()
+        g.db = get_client().get_default_database()
     return g.db
 
 
+def pool_stats(app=None):
+    """Return connection pool counters for the current process"""
+    app = app or current_app._get_current_object()
+    get_client(app)
+    return app.extensions['mongo']['pool_stats'].snapshot()
+
+
 def close_db(e=None):
     """
-    Close the MongoDB connection.
+    Release the request's database handle.
+    The pooled client itself stays open for the lifetime of the process.
     """
-    db = g.pop('db', None)
-    if db is not None:
-        db.client.close()
+    g.pop('db', None)
+
+
+def close_client(app):
+    """Close the shared client for the app, if one was created"""
+    state = app.extensions.pop('mongo', None)
+    if state is not None and state['pid'] == os.getpid():
+        state['client'].close()
 
 
 def init_app(app):
     """
-    Register database functions with the Flask app.
+    Create the shared MongoDB client and register database functions
+    with the Flask app.
     """
+    _create_client(app)
     app.teardown_appcontext(close_db)
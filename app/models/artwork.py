@@ -1,5 +1,6 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
 
 
 class Artwork:
@@ -14,6 +15,22 @@ class Artwork:
 
     collection_name = 'artworks'
 
+    # Indexes created by app.schema
+    indexes = [
+        # Lookups by title when seeding the catalog
+        IndexModel([('title', ASCENDING)])
+    ]
+
+    # Validator applied by app.schema (warn-only, so old documents still load)
+    schema = {
+        'bsonType': 'object',
+        'required': ['title', 'file_path'],
+        'properties': {
+            'title': {'bsonType': 'string'},
+            'file_path': {'bsonType': 'string'}
+        }
+    }
+
     @staticmethod
     def get_collection(db):
         """Get the MongoDB collection for artworks"""
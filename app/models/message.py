@@ -1,5 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
 
 
 class Message:
@@ -15,6 +17,25 @@ class Message:
 
     collection_name = 'messages'
 
+    # Indexes created by app.schema
+    indexes = [
+        # Recent messages and keyset history pages
+        IndexModel([('timestamp', DESCENDING), ('_id', DESCENDING)]),
+        # A user's own messages
+        IndexModel([('user_id', ASCENDING), ('timestamp', DESCENDING)])
+    ]
+
+    # Validator applied by app.schema (warn-only, so old documents still load)
+    schema = {
+        'bsonType': 'object',
+        'required': ['user_id', 'artwork_id', 'timestamp'],
+        'properties': {
+            'user_id': {'bsonType': 'objectId'},
+            'artwork_id': {'bsonType': 'objectId'},
+            'timestamp': {'bsonType': 'date'}
+        }
+    }
+
     @staticmethod
     def get_collection(db):
         """Get the MongoDB collection for messages"""
@@ -30,6 +51,71 @@ class Message:
         """Get recent messages, with newest first"""
         return list(Message.get_collection(db).find().sort('timestamp', -1).limit(limit))
 
+    @staticmethod
+    def encode_cursor(message):
+        """Build an opaque history cursor from a message's (timestamp, _id)"""
+        millis = (message['timestamp'] - datetime(1970, 1, 1)) // timedelta(milliseconds=1)
+        return f"{millis}.{message['_id']}"
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Parse a history cursor back into (timestamp, _id), or raise ValueError"""
+        try:
+            millis, message_id = cursor.split('.', 1)
+            timestamp = datetime(1970, 1, 1) + timedelta(milliseconds=int(millis))
+            return timestamp, ObjectId(message_id)
+        except (AttributeError, InvalidId, OverflowError) as e:
+            raise ValueError(f"Invalid history cursor: {cursor!r}") from e
+
+    @staticmethod
+    def find_page(db, before=None, limit=50):
+        """
+        Get a page of messages older than `before`, newest first, with user
+        and artwork details joined in.
+
+        Uses a (timestamp, _id) keyset instead of skip, so every page is a
+        bounded walk of the timestamp index however deep it is.
+        """
+        match = {}
+        if before is not None:
+            timestamp, message_id = Message.decode_cursor(before)
+            match = {'$or': [
+                {'timestamp': {'$lt': timestamp}},
+                {'timestamp': timestamp, '_id': {'$lt': message_id}}
+            ]}
+
+        pipeline = [
+            {'$match': match},
+            {'$sort': {'timestamp': -1, '_id': -1}},
+            {'$limit': limit},
+            {'$lookup': {
+                'from': 'users',
+                'localField': 'user_id',
+                'foreignField': '_id',
+                'as': 'user'
+            }},
+            {'$lookup': {
+                'from': 'artworks',
+                'localField': 'artwork_id',
+                'foreignField': '_id',
+                'as': 'artwork'
+            }},
+            # Keep messages from guests whose user document isn't written yet
+            {'$unwind': {'path': '$user', 'preserveNullAndEmptyArrays': True}},
+            {'$unwind': '$artwork'},
+            {'$project': {
+                'user_id': 1,
+                'timestamp': 1,
+                'user.username': 1,
+                'user.display_name': 1,
+                'user.avatar': 1,
+                'artwork._id': 1,
+                'artwork.title': 1,
+                'artwork.file_path': 1
+            }}
+        ]
+        return list(Message.get_collection(db).aggregate(pipeline))
+
     @staticmethod
     def create(db, user_id, artwork_id):
         """Create a new message"""
@@ -55,6 +141,24 @@ class Message:
         except Exception as e:
             print(f"Error in mark_seen: {str(e)}")
 
+    @staticmethod
+    def mark_seen_bulk(db, seen):
+        """
+        Mark many messages as seen in one round trip.
+        `seen` maps a message ID to the user IDs who have seen it.
+        """
+        operations = [
+            UpdateOne(
+                {'_id': ObjectId(message_id)},
+                {'$addToSet': {'seen_by': {'$each': [ObjectId(u) for u in user_ids]}}}
+            )
+            for message_id, user_ids in seen.items() if user_ids
+        ]
+        if not operations:
+            return 0
+        result = Message.get_collection(db).bulk_write(operations, ordered=False)
+        return result.modified_count
+
     @staticmethod
     def get_with_details(db, message_id):
         """Get a message with user and artwork details"""
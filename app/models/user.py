@@ -1,6 +1,9 @@
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
+from app.signals import user_profile_changed
 
 
 class User:
@@ -19,6 +22,29 @@ class User:
 
     collection_name = 'users'
 
+    # Indexes created by app.schema
+    indexes = [
+        IndexModel([('username', ASCENDING)], unique=True),
+        # Guests have no email, so only string emails must be unique
+        IndexModel(
+            [('email', ASCENDING)],
+            unique=True,
+            partialFilterExpression={'email': {'$type': 'string'}}
+        )
+    ]
+
+    # Validator applied by app.schema (warn-only, so old documents still load)
+    schema = {
+        'bsonType': 'object',
+        'required': ['username', 'display_name', 'created_at'],
+        'properties': {
+            'username': {'bsonType': 'string'},
+            'email': {'bsonType': 'string'},
+            'display_name': {'bsonType': 'string'},
+            'created_at': {'bsonType': 'date'}
+        }
+    }
+
     @staticmethod
     def get_collection(db):
         """Get the MongoDB collection for users"""
@@ -42,13 +68,6 @@ class User:
     @staticmethod
     def create(db, username, email, password, display_name=None):
         """Create a new user"""
-        # Check if username or email already exists
-        if User.find_by_username(db, username):
-            raise ValueError(f"Username '{username}' is already taken")
-
-        if User.find_by_email(db, email):
-            raise ValueError(f"Email '{email}' is already registered")
-
         # Create new user document
         user = {
             'username': username,
@@ -60,7 +79,18 @@ class User:
             'created_at': datetime.utcnow()
         }
 
-        result = User.get_collection(db).insert_one(user)
+        # The unique indexes reject duplicates, so no lookups are needed first
+        try:
+            result = User.get_collection(db).insert_one(user)
+        except DuplicateKeyError as e:
+            key_pattern = (e.details or {}).get('keyPattern')
+            if key_pattern is None:
+                # Older servers don't report the key; look it up on this rare path
+                key_pattern = {'email': 1} if User.find_by_email(db, email) else {}
+            if 'email' in key_pattern:
+                raise ValueError(f"Email '{email}' is already registered")
+            raise ValueError(f"Username '{username}' is already taken")
+
         user['_id'] = result.inserted_id
         return user
 
@@ -68,7 +98,7 @@ class User:
     def verify_password(db, username, password):
         """Verify a user's password"""
         user = User.find_by_username(db, username)
-        if not user:
+        if not user or not user.get('password_hash'):
             return False
         return check_password_hash(user['password_hash'], password)
 
@@ -79,3 +109,22 @@ class User:
             {'_id': ObjectId(user_id)},
             {'$set': {'last_active': datetime.utcnow()}}
         )
+
+    @staticmethod
+    def update_profile(db, user_id, display_name=None, avatar=None):
+        """Update a user's display name and/or avatar"""
+        changes = {}
+        if display_name is not None:
+            changes['display_name'] = display_name
+        if avatar is not None:
+            changes['avatar'] = avatar
+        if not changes:
+            return False
+
+        result = User.get_collection(db).update_one(
+            {'_id': ObjectId(user_id)},
+            {'$set': changes}
+        )
+        # Let in-process caches drop their copy of this profile
+        user_profile_changed.send(User, user_id=ObjectId(user_id))
+        return result.modified_count > 0
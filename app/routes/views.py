@@ -1,5 +1,7 @@
-from flask import Blueprint, render_template, send_from_directory, current_app
+from flask import Blueprint, render_template, send_from_directory, current_app, request, jsonify
 import os
+from app.database import get_db
+from app.services.history import get_history
 
 # Create a blueprint
 views_bp = Blueprint('views', __name__)
@@ -11,6 +13,20 @@ def index():
     return render_template('index.html', title='Drawed - Share Art')
 
 
+@views_bp.route('/api/history')
+def history():
+    """Page through chat history, newest first"""
+    try:
+        page = get_history(
+            get_db(),
+            before=request.args.get('before'),
+            limit=request.args.get('limit')
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(page)
+
+
 @views_bp.route('/artworks/<path:filename>')
 def serve_artwork(filename):
     """Serve artwork files"""
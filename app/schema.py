@@ -0,0 +1,152 @@
+import click
+from pymongo.errors import CollectionInvalid, OperationFailure, PyMongoError
+
+from app.models.artwork import Artwork
+from app.models.message import Message
+from app.models.user import User
+
+# Every model whose `indexes` and `schema` declarations should be applied
+MODELS = [User, Artwork, Message]
+
+
+def ensure_schema(db, model):
+    """
+    Create the model's collection with its validator, or update the
+    validator on an existing collection. Validation only warns, so
+    documents written before a schema change keep working.
+    """
+    validator = {'$jsonSchema': model.schema}
+    try:
+        db.create_collection(
+            model.collection_name,
+            validator=validator,
+            validationLevel='moderate',
+            validationAction='warn'
+        )
+    except CollectionInvalid:
+        # Collection already exists
+        db.command(
+            'collMod', model.collection_name,
+            validator=validator,
+            validationLevel='moderate',
+            validationAction='warn'
+        )
+
+
+def ensure_indexes(db, models=None, schema=True):
+    """
+    Idempotently create every declared index (and validator).
+    Returns {collection name: [index names]}; existing indexes are no-ops.
+    """
+    created = {}
+    for model in models or MODELS:
+        if schema and getattr(model, 'schema', None):
+            ensure_schema(db, model)
+        if model.indexes:
+            created[model.collection_name] = model.get_collection(db).create_indexes(model.indexes)
+    return created
+
+
+def index_builds(db):
+    """Return in-progress index builds with their progress counters"""
+    pipeline = [
+        {'$currentOp': {'allUsers': True, 'idleConnections': False}},
+        {'$match': {'command.createIndexes': {'$exists': True}}}
+    ]
+    builds = []
+    for op in db.client.admin.aggregate(pipeline):
+        progress = op.get('progress', {})
+        builds.append({
+            'collection': op['command']['createIndexes'],
+            'indexes': [index.get('name') for index in op['command'].get('indexes', [])],
+            'message': op.get('msg'),
+            'done': progress.get('done'),
+            'total': progress.get('total'),
+            'seconds_running': op.get('secs_running')
+        })
+    return builds
+
+
+def index_report(db, models=None):
+    """
+    Return declared and existing indexes with their on-disk sizes, per
+    collection, plus any declared index that is missing.
+    """
+    report = {}
+    for model in models or MODELS:
+        collection = model.get_collection(db)
+        try:
+            stats = next(collection.aggregate([{'$collStats': {'storageStats': {}}}]), {})
+            sizes = stats.get('storageStats', {}).get('indexSizes', {})
+        except OperationFailure:
+            # Collection doesn't exist yet
+            sizes = {}
+
+        existing = collection.index_information()
+        declared = [index.document['name'] for index in model.indexes]
+        report[model.collection_name] = {
+            'indexes': {name: sizes.get(name) for name in existing},
+            'missing': [name for name in declared if name not in existing]
+        }
+    return report
+
+
+def _echo_index_builds(db):
+    """Print progress of index builds running on the server"""
+    try:
+        builds = index_builds(db)
+    except OperationFailure as e:
+        # $currentOp needs the inprog privilege
+        click.echo(f"Index build progress unavailable: {str(e)}")
+        return
+    for build in builds:
+        click.echo(
+            f"Building {build['collection']} {build['indexes']}: "
+            f"{build['done']}/{build['total']} {build['message'] or ''}"
+        )
+
+
+@click.group('db')
+def db_cli():
+    """Database index and schema management."""
+
+
+@db_cli.command('ensure-indexes')
+@click.option('--no-schema', is_flag=True, help="Only create indexes, leave validators alone.")
+def ensure_indexes_command(no_schema):
+    """Create any missing indexes and validators."""
+    from app.database import get_db
+
+    created = ensure_indexes(get_db(), schema=not no_schema)
+    for collection, names in created.items():
+        click.echo(f"{collection}: {', '.join(names)}")
+    _echo_index_builds(get_db())
+
+
+@db_cli.command('indexes')
+def indexes_command():
+    """Show indexes, their sizes and any that are missing."""
+    from app.database import get_db
+
+    for collection, info in index_report(get_db()).items():
+        click.echo(collection)
+        for name, size in info['indexes'].items():
+            size = f"{size} bytes" if size is not None else "size unknown"
+            click.echo(f"  {name}: {size}")
+        for name in info['missing']:
+            click.echo(f"  {name}: MISSING (run `flask db ensure-indexes`)")
+    _echo_index_builds(get_db())
+
+
+def init_app(app):
+    """
+    Register the `flask db` commands and apply indexes at startup if enabled.
+    """
+    app.cli.add_command(db_cli)
+
+    if app.config['MONGO_ENSURE_INDEXES']:
+        from app.database import get_client
+        try:
+            ensure_indexes(get_client(app).get_default_database())
+        except PyMongoError as e:
+            print(f"Could not create indexes: {str(e)}")
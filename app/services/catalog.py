@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+
+from flask import current_app
+from pymongo.errors import PyMongoError
+
+from app.models.artwork import Artwork
+
+
+class ArtworkCatalog:
+    """
+    In-process copy of the artworks collection.
+
+    The documents are kept in a plain list so a random pick is a single
+    O(1) index instead of a `$sample` aggregation round trip. The list is
+    replaced wholesale on refresh, so readers never need a lock.
+
+    Freshness:
+    - Entries expire after `ttl` seconds and are reloaded on the next pick
+    - A change stream (when the server supports one) expires them early
+    - An empty or never-loaded catalog falls back to Artwork.random
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.version = 0
+        self._artworks = []
+        self._expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._artworks)
+
+    @property
+    def is_cold(self):
+        """True when there is nothing cached to pick from"""
+        return not self._artworks
+
+    @property
+    def is_stale(self):
+        """True when the cached documents have outlived the TTL"""
+        return time.monotonic() >= self._expires_at
+
+    def load(self, db):
+        """Load every artwork into memory and bump the catalog version"""
+        artworks = list(Artwork.get_collection(db).find())
+        self._artworks = artworks
+        self._expires_at = time.monotonic() + self.ttl
+        self.version += 1
+        return len(artworks)
+
+    def invalidate(self):
+        """Force a reload on the next pick"""
+        self._expires_at = 0.0
+
+    def refresh(self, db):
+        """
+        Reload the catalog if it is stale.
+        Only one caller reloads at a time; the others keep serving the
+        previous list until the new one is swapped in.
+        """
+        if not self.is_stale:
+            return False
+        if not self._refresh_lock.acquire(blocking=self.is_cold):
+            return False
+        try:
+            if self.is_stale:
+                self.load(db)
+                return True
+            return False
+        except PyMongoError as e:
+            print(f"Error refreshing artwork catalog: {str(e)}")
+            return False
+        finally:
+            self._refresh_lock.release()
+
+    def random(self, db):
+        """Pick a random artwork, falling back to `$sample` when cold"""
+        self.refresh(db)
+        artworks = self._artworks
+        if not artworks:
+            return Artwork.random(db)
+        return artworks[random.randrange(len(artworks))]
+
+    def watch(self, db):
+        """
+        Expire the catalog whenever the artworks collection changes.
+        Blocks while the change stream is open, so run it as a background
+        task. Standalone servers don't support change streams; the TTL
+        alone keeps the catalog fresh there.
+        """
+        try:
+            with Artwork.get_collection(db).watch() as stream:
+                for _ in stream:
+                    self.invalidate()
+        except PyMongoError as e:
+            print(f"Artwork catalog change stream unavailable: {str(e)}")
+
+
+def get_catalog(app=None):
+    """Return the artwork catalog for the app"""
+    app = app or current_app._get_current_object()
+    return app.extensions['artwork_catalog']
+
+
+def init_app(app):
+    """
+    Create the artwork catalog, warm it and start the change stream watcher.
+    """
+    from app import socketio
+    from app.database import get_client
+
+    catalog = ArtworkCatalog(ttl=app.config['ARTWORK_CATALOG_TTL'])
+    app.extensions['artwork_catalog'] = catalog
+
+    if app.config['ARTWORK_CATALOG_PRELOAD']:
+        db = get_client(app).get_default_database()
+        try:
+            catalog.load(db)
+        except PyMongoError as e:
+            print(f"Artwork catalog not preloaded: {str(e)}")
+
+    if app.config['ARTWORK_CATALOG_WATCH']:
+        socketio.start_background_task(
+            catalog.watch, get_client(app).get_default_database()
+        )
+
+    return catalog
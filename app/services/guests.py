@@ -0,0 +1,114 @@
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from pymongo import UpdateOne
+
+from app.models.user import User
+from app.services.writer import BulkWriter
+
+
+def guest_profile(user_id):
+    """
+    Build the public profile of a guest from its id alone.
+    Guests have no password, email or avatar, so nothing needs to be read
+    from the database to display them.
+    """
+    user_id = ObjectId(user_id)
+    return {
+        '_id': user_id,
+        'username': f"guest_{user_id}",
+        'display_name': "Guest User",
+        'avatar': None
+    }
+
+
+def new_guest():
+    """Allocate a guest identity without touching the database"""
+    return guest_profile(ObjectId())
+
+
+class GuestIdentities:
+    """
+    Issues signed guest tokens and writes guest users lazily.
+
+    A guest only exists in the session (and in the token the client keeps
+    for reconnects) until it first sends art. Its user document is then
+    queued as an idempotent upsert and written in bulk with other new
+    guests.
+    """
+
+    salt = 'drawed-guest'
+    # Upserts are idempotent, so forgetting saved guests only costs a
+    # redundant write; it keeps the set bounded in long-lived workers
+    max_remembered = 100000
+
+    def __init__(self, secret_key, max_age, writer):
+        self.max_age = max_age
+        self.writer = writer
+        self._serializer = URLSafeTimedSerializer(secret_key, salt=self.salt)
+        self._persisted = set()
+
+    def sign(self, user_id):
+        """Return a signed token for a guest id"""
+        return self._serializer.dumps(str(user_id))
+
+    def load(self, token):
+        """Return the guest id in a token, or None if it is invalid or expired"""
+        if not token:
+            return None
+        try:
+            return ObjectId(self._serializer.loads(token, max_age=self.max_age))
+        except (BadSignature, InvalidId, TypeError):
+            return None
+
+    def ensure_saved(self, db, user_id):
+        """Queue the guest's user document if this process hasn't already"""
+        key = str(user_id)
+        if key in self._persisted:
+            return False
+
+        guest = guest_profile(user_id)
+        now = datetime.utcnow()
+        guest.update({'guest': True, 'last_active': now, 'created_at': now})
+        if len(self._persisted) >= self.max_remembered:
+            self._persisted.clear()
+        self.writer.add(db, key, UpdateOne(
+            {'_id': guest['_id']},
+            {'$setOnInsert': guest},
+            upsert=True
+        ))
+        self._persisted.add(key)
+        return True
+
+
+def get_guests(app=None):
+    """Return the guest identity service for the app"""
+    app = app or current_app._get_current_object()
+    return app.extensions['guests']
+
+
+def init_app(app):
+    """
+    Create the guest identity service and its background bulk writer.
+    """
+    from app import socketio
+
+    writer = BulkWriter(
+        User.collection_name,
+        max_batch=app.config['GUEST_WRITE_BATCH_SIZE'],
+        interval=app.config['GUEST_WRITE_INTERVAL']
+    )
+    guests = GuestIdentities(
+        app.config['SECRET_KEY'],
+        max_age=app.config['GUEST_TOKEN_MAX_AGE'],
+        writer=writer
+    )
+    app.extensions['guests'] = guests
+
+    if app.config['BULK_WRITE_BACKGROUND_FLUSH']:
+        socketio.start_background_task(writer.run, app)
+
+    return guests
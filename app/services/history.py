@@ -0,0 +1,43 @@
+from flask import current_app
+
+from app.models.message import Message
+from app.services.guests import guest_profile
+
+
+def message_payload(message, user, artwork):
+    """Build the client-facing dict for a message (the `new_art` shape)"""
+    return {
+        'message_id': str(message['_id']),
+        'user_id': str(message['user_id']),
+        'username': user['username'],
+        'display_name': user['display_name'],
+        'artwork': {
+            'id': str(artwork['_id']),
+            'title': artwork['title'],
+            'file_path': artwork['file_path']
+        },
+        'timestamp': message['timestamp'].isoformat()
+    }
+
+
+def get_history(db, before=None, limit=None):
+    """
+    Return one page of chat history, newest first.
+
+    Raises ValueError for a malformed cursor. `next_cursor` is None once
+    the oldest message has been returned.
+    """
+    max_limit = current_app.config['HISTORY_MAX_LIMIT']
+    limit = min(max(int(limit or current_app.config['HISTORY_PAGE_SIZE']), 1), max_limit)
+
+    messages = Message.find_page(db, before=before, limit=limit)
+    payloads = [
+        message_payload(
+            message,
+            message.get('user') or guest_profile(message['user_id']),
+            message['artwork']
+        )
+        for message in messages
+    ]
+    next_cursor = Message.encode_cursor(messages[-1]) if len(messages) == limit else None
+    return {'messages': payloads, 'next_cursor': next_cursor}
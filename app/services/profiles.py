@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+
+from bson import ObjectId
+from flask import current_app
+
+from app.models.user import User
+from app.signals import user_profile_changed
+
+
+class ProfileCache:
+    """
+    Per-process LRU of the public user fields needed to render a message.
+
+    Keyed by the session's user_id string. Entries are dropped when the
+    profile changes in this process (via the user_profile_changed signal)
+    and expire after `ttl` seconds to bound staleness across workers.
+    """
+
+    PROFILE_FIELDS = ('username', 'display_name', 'avatar')
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _profile(self, user):
+        """Keep only the cached fields of a user document"""
+        profile = {field: user.get(field) for field in self.PROFILE_FIELDS}
+        profile['_id'] = user['_id']
+        return profile
+
+    def put(self, user):
+        """Cache a user document that is already in hand"""
+        key = str(user['_id'])
+        entry = (self._profile(user), time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, db, user_id):
+        """Return the cached profile for a user, loading it on a miss"""
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        projection = {field: 1 for field in self.PROFILE_FIELDS}
+        user = User.get_collection(db).find_one({'_id': ObjectId(user_id)}, projection)
+        if user is None:
+            return None
+        self.put(user)
+        return self._profile(user)
+
+    def invalidate(self, user_id):
+        """Drop a user's cached profile"""
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        """Drop every cached profile"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters as a plain dict"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+def get_profiles(app=None):
+    """Return the user profile cache for the app"""
+    app = app or current_app._get_current_object()
+    return app.extensions['profile_cache']
+
+
+def init_app(app):
+    """
+    Create the profile cache and invalidate it on profile changes.
+    """
+    cache = ProfileCache(
+        maxsize=app.config['USER_PROFILE_CACHE_SIZE'],
+        ttl=app.config['USER_PROFILE_CACHE_TTL']
+    )
+    app.extensions['profile_cache'] = cache
+
+    def on_profile_changed(sender, user_id, **extra):
+        cache.invalidate(user_id)
+
+    # Keep a reference on the cache: blinker only holds receivers weakly
+    cache._on_profile_changed = on_profile_changed
+    user_profile_changed.connect(on_profile_changed)
+
+    return cache
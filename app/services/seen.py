@@ -0,0 +1,124 @@
+import threading
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import current_app
+from pymongo.errors import PyMongoError
+
+from app.models.message import Message
+
+
+class SeenCoalescer:
+    """
+    Buffers (message_id, user_id) "seen" marks and writes them in bulk.
+
+    Every broadcast to N clients comes back as N mark_seen events. Instead
+    of one update_one each, pairs are collected per message (repeats are
+    dropped) and flushed as one $addToSet per message in a single
+    bulk_write, either when `max_pending` pairs are buffered or every
+    `interval` seconds from a background task.
+    """
+
+    def __init__(self, max_pending=500, interval=1.0):
+        self.max_pending = max_pending
+        self.interval = interval
+        self.queued = 0
+        self.deduplicated = 0
+        self.flushes = 0
+        self.written = 0
+        self.errors = 0
+        self._pending = {}
+        self._pending_pairs = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._pending_pairs
+
+    def add(self, db, message_id, user_id):
+        """Queue a seen mark, flushing right away if the buffer is full"""
+        try:
+            message_id, user_id = ObjectId(message_id), ObjectId(user_id)
+        except (InvalidId, TypeError):
+            return False
+
+        with self._lock:
+            readers = self._pending.setdefault(message_id, set())
+            self.queued += 1
+            if user_id in readers:
+                self.deduplicated += 1
+                return False
+            readers.add(user_id)
+            self._pending_pairs += 1
+            full = self._pending_pairs >= self.max_pending
+
+        if full:
+            self.flush(db)
+        return True
+
+    def add_many(self, db, message_ids, user_id):
+        """Queue seen marks for several messages; returns how many were new"""
+        return sum(1 for message_id in message_ids if self.add(db, message_id, user_id))
+
+    def flush(self, db):
+        """Write every buffered seen mark in one bulk_write"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, pairs = self._pending, self._pending_pairs
+            self._pending, self._pending_pairs = {}, 0
+
+        try:
+            Message.mark_seen_bulk(db, pending)
+        except PyMongoError as e:
+            self.errors += pairs
+            print(f"Error flushing seen marks: {str(e)}")
+            return 0
+
+        self.flushes += 1
+        self.written += pairs
+        return pairs
+
+    def run(self, app):
+        """Flush every `interval` seconds; meant for start_background_task"""
+        from app import socketio
+        from app.database import get_client
+
+        while True:
+            socketio.sleep(self.interval)
+            if self._pending:
+                self.flush(get_client(app).get_default_database())
+
+    def stats(self):
+        """Return queue and flush counters as a plain dict"""
+        return {
+            'pending': self._pending_pairs,
+            'queued': self.queued,
+            'deduplicated': self.deduplicated,
+            'flushes': self.flushes,
+            'written': self.written,
+            'errors': self.errors
+        }
+
+
+def get_seen(app=None):
+    """Return the seen-mark coalescer for the app"""
+    app = app or current_app._get_current_object()
+    return app.extensions['seen_coalescer']
+
+
+def init_app(app):
+    """
+    Create the seen-mark coalescer and its background flush task.
+    """
+    from app import socketio
+
+    coalescer = SeenCoalescer(
+        max_pending=app.config['MARK_SEEN_BATCH_SIZE'],
+        interval=app.config['MARK_SEEN_FLUSH_INTERVAL']
+    )
+    app.extensions['seen_coalescer'] = coalescer
+
+    if app.config['BULK_WRITE_BACKGROUND_FLUSH']:
+        socketio.start_background_task(coalescer.run, app)
+
+    return coalescer
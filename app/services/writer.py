@@ -0,0 +1,95 @@
+import threading
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+class BulkWriter:
+    """
+    Buffers write operations for one collection and sends them with a
+    single bulk_write.
+
+    Operations are keyed so a repeat of the same logical write replaces
+    the pending one instead of adding another. The buffer is flushed
+    when it reaches `max_batch` operations, and by a background task
+    every `interval` seconds (see run).
+    """
+
+    def __init__(self, collection_name, max_batch=500, interval=1.0):
+        self.collection_name = collection_name
+        self.max_batch = max_batch
+        self.interval = interval
+        self.queued = 0
+        self.deduplicated = 0
+        self.flushes = 0
+        self.written = 0
+        self.errors = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, key):
+        return key in self._pending
+
+    def add(self, db, key, operation):
+        """
+        Queue an operation, flushing right away if the batch is full.
+        Returns True if the operation was new, False if it replaced a
+        pending write with the same key.
+        """
+        with self._lock:
+            is_new = key not in self._pending
+            self._pending[key] = operation
+            self.queued += 1
+            if not is_new:
+                self.deduplicated += 1
+            full = len(self._pending) >= self.max_batch
+
+        if full:
+            self.flush(db)
+        return is_new
+
+    def flush(self, db):
+        """Send every pending operation in one unordered bulk_write"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            operations = list(self._pending.values())
+            self._pending = {}
+
+        try:
+            db[self.collection_name].bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Unordered: the rest of the batch was still applied
+            self.errors += len(e.details.get('writeErrors', []))
+            print(f"Bulk write errors in {self.collection_name}: {e.details.get('writeErrors')}")
+        except PyMongoError as e:
+            self.errors += len(operations)
+            print(f"Error flushing {self.collection_name} writes: {str(e)}")
+            return 0
+
+        self.flushes += 1
+        self.written += len(operations)
+        return len(operations)
+
+    def run(self, app):
+        """Flush every `interval` seconds; meant for start_background_task"""
+        from app import socketio
+        from app.database import get_client
+
+        while True:
+            socketio.sleep(self.interval)
+            if self._pending:
+                self.flush(get_client(app).get_default_database())
+
+    def stats(self):
+        """Return queue and flush counters as a plain dict"""
+        return {
+            'pending': len(self._pending),
+            'queued': self.queued,
+            'deduplicated': self.deduplicated,
+            'flushes': self.flushes,
+            'written': self.written,
+            'errors': self.errors
+        }
@@ -0,0 +1,7 @@
+from blinker import Namespace
+
+# Signals sent by the models so in-process caches can invalidate entries
+_signals = Namespace()
+
+# Sent with user_id=<ObjectId> whenever a user's public profile changes
+user_profile_changed = _signals.signal('user-profile-changed')
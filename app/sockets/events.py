@@ -2,55 +2,46 @@ from flask import request, session, current_app
 from flask_socketio import emit, join_room, leave_room
 from app import socketio
 from app.database import get_db
-from app.models.artwork import Artwork
 from app.models.message import Message
-from app.models.user import User
+from app.services.catalog import get_catalog
+from app.services.guests import get_guests, guest_profile, new_guest
+from app.services.history import get_history, message_payload
+from app.services.profiles import get_profiles
+from app.services.seen import get_seen
 from datetime import datetime
 from bson import ObjectId
 
 
 @socketio.on('connect')
-def handle_connect():
+def handle_connect(auth=None):
     """Handle client connection"""
-    # For now, use a default guest user ID if none exists
+    # For now, anonymous clients get a guest identity
     # In a real app, you would use authentication here
+    guests = get_guests()
     if 'user_id' not in session:
-        # Create a guest user in the database to get a proper ObjectId
-        db = get_db()
-        guest_name = f"guest_{datetime.utcnow().timestamp()}"
-        try:
-            user = User.create(
-                db,
-                username=guest_name,
-                email=f"{guest_name}@example.com",
-                password="guest_password",  # This is just a placeholder
-                display_name="Guest User"
-            )
-            # Store the ObjectId as a string in the session
-            session['user_id'] = str(user['_id'])
-            session.modified = True
-        except ValueError:
-            # If username is taken, try again with a different timestamp
-            guest_name = f"guest_{datetime.utcnow().timestamp()}"
-            user = User.create(
-                db,
-                username=guest_name,
-                email=f"{guest_name}@example.com",
-                password="guest_password",
-                display_name="Guest User"
-            )
-            session['user_id'] = str(user['_id'])
-            session.modified = True
+        # Reuse the guest id from a token the client kept, or allocate a
+        # new one. Nothing is written until the guest first sends art.
+        guest_id = guests.load((auth or {}).get('guest_token'))
+        user = guest_profile(guest_id) if guest_id else new_guest()
+
+        # Store the ObjectId as a string in the session
+        session['user_id'] = str(user['_id'])
+        session['guest'] = True
+        session.modified = True
 
     # Join the main room
     join_room('main_room')
 
     # Emit a welcome message
-    emit('status', {
+    status = {
         'message': f"Connected to chat server",
         'count': 0,  # You might want to get the actual count from the database
         'timestamp': datetime.utcnow().isoformat()
-    })
+    }
+    if session.get('guest'):
+        # The client sends this back on reconnect to keep its identity
+        status['guest_token'] = guests.sign(session['user_id'])
+    emit('status', status)
 
 
 @socketio.on('disconnect')
@@ -74,8 +65,8 @@ def handle_send_art(data):
         })
         return
 
-    # Get a random artwork from the database
-    artwork = Artwork.random(db)
+    # Get a random artwork from the in-memory catalog
+    artwork = get_catalog().random(db)
 
     # If no artwork is found, return an error message
     if not artwork:
@@ -87,28 +78,24 @@ def handle_send_art(data):
 
     # Create the message
     try:
+        if session.get('guest'):
+            # First art from this guest: queue its user document
+            get_guests().ensure_saved(db, user_id)
+
         message = Message.create(
             db,
             user_id=user_id,
             artwork_id=str(artwork['_id'])
         )
 
-        # Find user info for the message
-        user = User.find_one(db, ObjectId(user_id))
+        # Find user info for the message (cached after the first lookup)
+        if session.get('guest'):
+            user = guest_profile(user_id)
+        else:
+            user = get_profiles().get(db, user_id)
 
         # Broadcast the message to all clients in the room
-        emit('new_art', {
-            'message_id': str(message['_id']),
-            'user_id': user_id,
-            'username': user['username'],
-            'display_name': user['display_name'],
-            'artwork': {
-                'id': str(artwork['_id']),
-                'title': artwork['title'],
-                'file_path': artwork['file_path']
-            },
-            'timestamp': message['timestamp'].isoformat()
-        }, room='main_room')
+        emit('new_art', message_payload(message, user, artwork), room='main_room')
     except Exception as e:
         # Log the error and send error message
         print(f"Error sending art: {str(e)}")
@@ -121,7 +108,24 @@ def handle_send_art(data):
 @socketio.on('mark_seen')
 def handle_mark_seen(data):
     """Mark a message as seen by the current user"""
-    if 'message_id' not in data:
+    if not isinstance(data, dict) or 'message_id' not in data:
+        return
+
+    db = get_db()
+    user_id = session.get('user_id')
+
+    # Only proceed if we have a user ID
+    if not user_id:
+        return
+
+    # Queue the mark; it is written with others in one bulk_write
+    get_seen().add(db, data['message_id'], user_id)
+
+
+@socketio.on('mark_seen_batch')
+def handle_mark_seen_batch(data):
+    """Mark several messages as seen by the current user"""
+    if not isinstance(data, dict) or not isinstance(data.get('message_ids'), list):
         return
 
     db = get_db()
@@ -131,8 +135,22 @@ def handle_mark_seen(data):
     if not user_id:
         return
 
+    max_ids = current_app.config['MARK_SEEN_BATCH_MAX_IDS']
+    get_seen().add_many(db, data['message_ids'][:max_ids], user_id)
+
+
+@socketio.on('get_history')
+def handle_get_history(data):
+    """Send the client a page of older messages"""
+    data = data if isinstance(data, dict) else {}
+
     try:
-        # Mark the message as seen
-        Message.mark_seen(db, data['message_id'], user_id)
-    except Exception as e:
-        print(f"Error marking message as seen: {str(e)}")
+        page = get_history(get_db(), before=data.get('before'), limit=data.get('limit'))
+    except (TypeError, ValueError) as e:
+        emit('error', {
+            'message': f"Invalid history request: {str(e)}",
+            'timestamp': datetime.utcnow().isoformat()
+        })
+        return
+
+    emit('history', page)
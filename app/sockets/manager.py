@@ -0,0 +1,230 @@
+import pickle
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+import socketio
+from bson import Binary, ObjectId
+from pymongo import CursorType, MongoClient
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+
+class MongoManager(socketio.PubSubManager):
+    """
+    Socket.IO client manager that shares broadcasts between processes
+    through a capped MongoDB collection.
+
+    Every worker tails the collection with a tailable/await cursor, so an
+    emit to a room on one worker reaches clients connected to any other
+    worker, without running Redis next to the database we already have.
+
+    - Publishes are batched: messages queued within `batch_interval`
+      seconds (or up to `batch_size` of them) go out as one document
+    - Delivery lag (publish time to receive time) is tracked in `stats`
+    - The cursor resumes after errors and, with a `node_id`, from a
+      checkpoint saved in `<channel>.cursors` after a restart, as long as
+      the checkpoint is younger than `resume_window` seconds
+
+    Usage:
+        mgr = MongoManager('mongodb://localhost:27017/drawed')
+        socketio.init_app(app, client_manager=mgr)
+    """
+
+    name = 'mongo'
+
+    def __init__(self, url='mongodb://localhost:27017/drawed', channel='socketio',
+                 write_only=False, logger=None, collection_size=16 * 1024 * 1024,
+                 batch_size=100, batch_interval=0.01, node_id=None,
+                 checkpoint_interval=5.0, resume_window=10.0, client=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.url = url
+        self.collection_size = collection_size
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.node_id = node_id
+        self.checkpoint_interval = checkpoint_interval
+        self.resume_window = resume_window
+        # A dedicated client by default, so the long-lived tailing cursor
+        # doesn't hold a connection from the app's pool
+        self.client = client
+        self.stats = {
+            'published': 0,
+            'publish_batches': 0,
+            'publish_errors': 0,
+            'received': 0,
+            'received_batches': 0,
+            'resumes': 0,
+            'lag_ms_last': None,
+            'lag_ms_max': 0.0,
+            'lag_ms_avg': None
+        }
+        self._batch = []
+        self._batch_lock = threading.Lock()
+        self._flush_scheduled = False
+        # Batch ids already delivered, to skip repeats after a resume
+        self._recent_ids = deque(maxlen=1000)
+        self._last_checkpoint = 0.0
+
+    def _collection(self):
+        if self.client is None:
+            self.client = MongoClient(self.url)
+        return self.client.get_default_database()[self.channel]
+
+    def _cursors(self):
+        return self._collection().database[f"{self.channel}.cursors"]
+
+    def _ensure_collection(self):
+        """Create the capped collection; tailable cursors need one"""
+        collection = self._collection()
+        try:
+            collection.database.create_collection(
+                self.channel, capped=True, size=self.collection_size
+            )
+        except CollectionInvalid:
+            pass
+        return collection
+
+    def _spawn(self, target):
+        if self.server is not None:
+            return self.server.start_background_task(target)
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    def _sleep(self, seconds):
+        if self.server is not None:
+            return self.server.sleep(seconds)
+        time.sleep(seconds)
+
+    def _publish(self, data):
+        """Queue a message; it is written with others in one document"""
+        with self._batch_lock:
+            self._batch.append(Binary(pickle.dumps(data)))
+            full = len(self._batch) >= self.batch_size
+            schedule = not full and not self._flush_scheduled
+            if schedule:
+                self._flush_scheduled = True
+
+        if full or self.batch_interval <= 0:
+            self._flush()
+        elif schedule:
+            self._spawn(self._delayed_flush)
+
+    def _delayed_flush(self):
+        self._sleep(self.batch_interval)
+        self._flush()
+
+    def _flush(self):
+        """Write the queued messages as one document"""
+        with self._batch_lock:
+            batch, self._batch = self._batch, []
+            self._flush_scheduled = False
+        if not batch:
+            return 0
+
+        try:
+            self._collection().insert_one({
+                'host_id': self.host_id,
+                'ts': datetime.utcnow(),
+                'messages': batch
+            })
+        except PyMongoError:
+            self.stats['publish_errors'] += len(batch)
+            self._get_logger().exception('Cannot publish to the MongoDB message queue')
+            return 0
+
+        self.stats['published'] += len(batch)
+        self.stats['publish_batches'] += 1
+        return len(batch)
+
+    def _record_lag(self, published_at):
+        lag_ms = (datetime.utcnow() - published_at).total_seconds() * 1000
+        stats = self.stats
+        stats['lag_ms_last'] = lag_ms
+        stats['lag_ms_max'] = max(stats['lag_ms_max'], lag_ms)
+        # Exponential moving average, so the number tracks recent load
+        avg = stats['lag_ms_avg']
+        stats['lag_ms_avg'] = lag_ms if avg is None else avg * 0.9 + lag_ms * 0.1
+
+    def _load_checkpoint(self):
+        """
+        Return (last batch id, its publish time) to resume after, or
+        (None, None) to start at the tail
+        """
+        if not self.node_id:
+            return None, None
+        checkpoint = self._cursors().find_one({'_id': self.node_id})
+        if checkpoint is None:
+            return None, None
+        age = datetime.utcnow() - checkpoint['updated_at']
+        if age > timedelta(seconds=self.resume_window):
+            return None, None
+        return checkpoint['last_id'], checkpoint['last_ts']
+
+    def _save_checkpoint(self, last_id, last_ts, force=False):
+        if not self.node_id or last_id is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_checkpoint < self.checkpoint_interval:
+            return
+        self._last_checkpoint = now
+        try:
+            self._cursors().update_one(
+                {'_id': self.node_id},
+                {'$set': {
+                    'last_id': last_id,
+                    'last_ts': last_ts,
+                    'updated_at': datetime.utcnow()
+                }},
+                upsert=True
+            )
+        except PyMongoError:
+            self._get_logger().exception('Cannot save message queue checkpoint')
+
+    def _tail_start(self, collection):
+        """Id of the newest batch, so a fresh listener skips old broadcasts"""
+        latest = collection.find_one(sort=[('$natural', -1)])
+        return latest['_id'] if latest else None
+
+    def _listen(self):
+        collection = self._ensure_collection()
+        last_id, last_ts = self._load_checkpoint()
+        if last_id is None:
+            # Fresh start: only deliver batches published from now on
+            last_id = self._tail_start(collection)
+            last_ts = skip_until = datetime.utcnow()
+        else:
+            skip_until = last_ts
+        resume_from = last_id
+
+        while True:
+            try:
+                query = {}
+                if resume_from is not None:
+                    # ObjectIds from different hosts are only roughly ordered,
+                    # so resume a little early and skip batches already seen
+                    window_start = resume_from.generation_time - timedelta(seconds=2)
+                    query = {'_id': {'$gt': ObjectId.from_datetime(window_start)}}
+                cursor = collection.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+
+                while cursor.alive:
+                    for document in cursor:
+                        if document['_id'] in self._recent_ids or document['ts'] <= skip_until:
+                            continue
+                        self._recent_ids.append(document['_id'])
+                        last_id, last_ts = document['_id'], document['ts']
+                        self.stats['received_batches'] += 1
+                        self.stats['received'] += len(document['messages'])
+                        self._record_lag(document['ts'])
+                        for message in document['messages']:
+                            yield pickle.loads(message)
+                        self._save_checkpoint(last_id, last_ts)
+            except PyMongoError:
+                self._get_logger().exception('MongoDB message queue cursor failed, resuming')
+                self.stats['resumes'] += 1
+                self._save_checkpoint(last_id, last_ts, force=True)
+
+            resume_from = last_id
+            # An empty capped collection returns a dead cursor right away
+            self._sleep(1)
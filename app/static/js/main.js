@@ -1,7 +1,29 @@
 document.addEventListener('DOMContentLoaded', function() {
     // Socket.io connection
-    const socket = io();
+    // Send back the guest token from a previous connection so reconnects
+    // keep the same guest identity
+    const socket = io({
+        auth: function(cb) {
+            cb({ guest_token: localStorage.getItem('drawed_guest_token') });
+        }
+    });
     
+    // Message IDs waiting to be reported as seen
+    let pendingSeen = [];
+    let seenTimer = null;
+
+    // Report seen messages in batches instead of one event per message
+    function markSeen(messageId) {
+        pendingSeen.push(messageId);
+        if (seenTimer === null) {
+            seenTimer = setTimeout(function() {
+                socket.emit('mark_seen_batch', { message_ids: pendingSeen });
+                pendingSeen = [];
+                seenTimer = null;
+            }, 1000);
+        }
+    }
+
     // DOM elements
     const sendArtButton = document.getElementById('send-art-btn');
     const messagesContainer = document.querySelector('.messages-container');
@@ -9,6 +31,9 @@ document.addEventListener('DOMContentLoaded', function() {
     // Connect to socket.io
     socket.on('connect', function() {
         console.log('Connected to server');
+        if (!historyLoaded) {
+            loadHistory(null);
+        }
     });
     
     // Handle connection errors
@@ -19,6 +44,9 @@ document.addEventListener('DOMContentLoaded', function() {
     // Handle status messages from server
     socket.on('status', function(data) {
         console.log('Status:', data.message);
+        if (data.guest_token) {
+            localStorage.setItem('drawed_guest_token', data.guest_token);
+        }
     });
     
     // Handle error messages from server
@@ -27,10 +55,8 @@ document.addEventListener('DOMContentLoaded', function() {
         // You might want to display this to the user
     });
     
-    // Handle new artwork messages
-    socket.on('new_art', function(data) {
-        console.log('New artwork received:', data);
-        
+    // Build the DOM element for an artwork message
+    function createArtMessage(data) {
         // Create a new message element
         const messageEl = document.createElement('div');
         messageEl.className = 'art-message';
@@ -100,14 +126,62 @@ document.addEventListener('DOMContentLoaded', function() {
         messageEl.appendChild(userEl);
         messageEl.appendChild(timeEl);
         
+        return messageEl;
+    }
+    
+    // Cursor for the next page of older messages (null when there are none)
+    let historyCursor = null;
+    let historyLoaded = false;
+    let historyLoading = false;
+    
+    function loadHistory(before) {
+        historyLoading = true;
+        socket.emit('get_history', before ? { before: before } : {});
+    }
+    
+    // Handle pages of older messages (newest first)
+    socket.on('history', function(data) {
+        const previousHeight = messagesContainer.scrollHeight;
+        const firstMessage = messagesContainer.querySelector('.art-message');
+        
+        data.messages.slice().reverse().forEach(function(message) {
+            // Skip messages that already arrived live
+            if (messagesContainer.querySelector(`[data-message-id="${message.message_id}"]`)) {
+                return;
+            }
+            messagesContainer.insertBefore(createArtMessage(message), firstMessage);
+        });
+        
+        if (historyLoaded) {
+            // Keep the view where it was while older messages are added above
+            messagesContainer.scrollTop += messagesContainer.scrollHeight - previousHeight;
+        } else {
+            messagesContainer.scrollTop = messagesContainer.scrollHeight;
+            historyLoaded = true;
+        }
+        historyCursor = data.next_cursor;
+        historyLoading = false;
+    });
+    
+    // Load older messages when scrolled to the top
+    messagesContainer.addEventListener('scroll', function() {
+        if (messagesContainer.scrollTop === 0 && historyCursor && !historyLoading) {
+            loadHistory(historyCursor);
+        }
+    });
+    
+    // Handle new artwork messages
+    socket.on('new_art', function(data) {
+        console.log('New artwork received:', data);
+        
         // Add to the messages container
-        messagesContainer.appendChild(messageEl);
+        messagesContainer.appendChild(createArtMessage(data));
         
         // Scroll to the bottom of the messages container
         messagesContainer.scrollTop = messagesContainer.scrollHeight;
         
         // Mark this message as seen
-        socket.emit('mark_seen', { message_id: data.message_id });
+        markSeen(data.message_id);
     });
     
     // Add click event listener to the "I'm Drawed" button
@@ -1,7 +1,7 @@
 from app.models.message import Message
 from app.models.artwork import Artwork
 from app.models.user import User
-from app.database import get_db
+from app.database import get_db, close_client
 from app import create_app
 import pytest
 import os
@@ -29,6 +29,8 @@ def app():
         db.artworks.delete_many({})
         db.messages.delete_many({})
 
+    close_client(app)
+
 
 @pytest.fixture
 def client(app):
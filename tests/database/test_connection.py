@@ -1 +1,64 @@
 """Tests for database connection."""
+from app.database import get_client, get_db, pool_stats, _client_options, PoolStats
+
+
+def test_get_db_reuses_shared_client(app):
+    """Test that every app context shares one pooled client."""
+    with app.app_context():
+        first = get_db()
+    with app.app_context():
+        second = get_db()
+
+    assert first.client is second.client
+    assert first.client is app.extensions['mongo']['client']
+
+
+def test_client_replaced_after_fork(app):
+    """Test that a client inherited from a parent process is not reused."""
+    original = get_client(app)
+    app.extensions['mongo']['pid'] = -1
+
+    replacement = get_client(app)
+
+    assert replacement is not original
+    assert get_client(app) is replacement
+
+
+def test_client_options_from_config(app):
+    """Test that pool and timeout settings come from the config."""
+    app.config['MONGO_MAX_POOL_SIZE'] = 7
+    app.config['MONGO_COMPRESSORS'] = 'zlib'
+    options = _client_options(app.config, PoolStats(7))
+
+    assert options['maxPoolSize'] == 7
+    assert options['compressors'] == 'zlib'
+    assert options['connect'] is False
+    assert options['serverSelectionTimeoutMS'] == app.config['MONGO_SERVER_SELECTION_TIMEOUT_MS']
+
+
+def test_pool_stats_counters():
+    """Test that the pool listener tracks checkouts and waits."""
+    stats = PoolStats(max_pool_size=1)
+    stats.connection_created(None)
+    stats.connection_check_out_started(None)
+    stats.connection_checked_out(None)
+    # Pool is exhausted, so the next checkout has to wait
+    stats.connection_check_out_started(None)
+    stats.connection_checked_in(None)
+
+    snapshot = stats.snapshot()
+    assert snapshot['checkouts'] == 1
+    assert snapshot['waits'] == 1
+    assert snapshot['in_use'] == 0
+    assert snapshot['open'] == 1
+    assert snapshot['idle'] == 1
+
+
+def test_pool_stats_exposed(app, db):
+    """Test that pool counters are available for the current app."""
+    db.artworks.find_one()
+    snapshot = pool_stats(app)
+
+    assert 'checkouts' in snapshot
+    assert 'in_use' in snapshot
+    assert snapshot['max_pool_size'] == app.config['MONGO_MAX_POOL_SIZE']
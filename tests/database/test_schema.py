@@ -0,0 +1,49 @@
+"""Tests for index and schema bootstrap."""
+from app.models.message import Message
+from app.models.user import User
+from app.schema import MODELS, db_cli, ensure_indexes
+
+
+def test_declared_indexes_exist(db):
+    """Test that every declared index is created at startup."""
+    for model in MODELS:
+        existing = model.get_collection(db).index_information()
+        for index in model.indexes:
+            assert index.document['name'] in existing
+
+
+def test_ensure_indexes_is_idempotent(db):
+    """Test that applying the declarations twice changes nothing."""
+    before = db.users.index_information()
+    ensure_indexes(db)
+
+    assert db.users.index_information() == before
+
+
+def test_hot_query_indexes_declared():
+    """Test that the hot query paths have a supporting index."""
+    message_keys = [list(index.document['key'].items()) for index in Message.indexes]
+    assert [('timestamp', -1), ('_id', -1)] in message_keys
+
+    unique_keys = [
+        list(index.document['key'].keys())
+        for index in User.indexes if index.document.get('unique')
+    ]
+    assert ['username'] in unique_keys
+    assert ['email'] in unique_keys
+
+
+def test_ensure_indexes_command(app, monkeypatch):
+    """Test the `flask db ensure-indexes` command."""
+    monkeypatch.setattr('app.schema.index_builds', lambda db: [{
+        'collection': 'messages', 'indexes': ['user_id_1_timestamp_-1'],
+        'message': 'Index Build: scanning', 'done': 10, 'total': 40,
+        'seconds_running': 1
+    }])
+    runner = app.test_cli_runner()
+    result = runner.invoke(db_cli, ['ensure-indexes', '--no-schema'])
+
+    assert result.exit_code == 0
+    assert 'messages:' in result.output
+    assert 'Building messages' in result.output
+    assert '10/40' in result.output
@@ -119,3 +119,50 @@ def test_get_with_details(db, test_message, test_user, test_artwork):
     assert message_with_details["artwork"]["_id"] == test_artwork["_id"]
     assert message_with_details["artwork"]["title"] == test_artwork["title"]
     assert message_with_details["artwork"]["file_path"] == test_artwork["file_path"]
+
+
+def test_mark_seen_bulk(db, test_message, test_user):
+    """Test marking several readers on a message in one call."""
+    readers = [ObjectId(), ObjectId()]
+
+    Message.mark_seen_bulk(db, {test_message["_id"]: readers + [test_user["_id"]]})
+
+    message = Message.find_one(db, test_message["_id"])
+    assert len(message["seen_by"]) == 3
+    assert all(reader in message["seen_by"] for reader in readers)
+
+    # Nothing to write
+    assert Message.mark_seen_bulk(db, {}) == 0
+
+
+def test_find_page_keyset_pagination(db, test_user, test_artwork):
+    """Test paging through history with (timestamp, _id) cursors."""
+    created = [
+        Message.create(db, user_id=test_user["_id"], artwork_id=test_artwork["_id"])
+        for _ in range(5)
+    ]
+
+    first_page = Message.find_page(db, limit=3)
+    cursor = Message.encode_cursor(first_page[-1])
+    second_page = Message.find_page(db, before=cursor, limit=3)
+
+    assert len(first_page) == 3
+    assert len(second_page) == 2
+    page_ids = [m["_id"] for m in first_page + second_page]
+    assert page_ids == [m["_id"] for m in reversed(created)]
+
+    # Messages come back with user and artwork details joined in
+    assert first_page[0]["user"]["username"] == test_user["username"]
+    assert first_page[0]["artwork"]["title"] == test_artwork["title"]
+
+
+def test_cursor_round_trip(db, test_message):
+    """Test that a cursor decodes to the message's timestamp and ID."""
+    message = Message.find_one(db, test_message["_id"])
+    timestamp, message_id = Message.decode_cursor(Message.encode_cursor(message))
+
+    assert timestamp == message["timestamp"]
+    assert message_id == message["_id"]
+
+    with pytest.raises(ValueError):
+        Message.decode_cursor("garbage")
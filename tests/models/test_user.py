@@ -91,3 +91,25 @@ def test_update_last_active(db, test_user):
     # Check that last_active was updated
     updated_user = User.find_one(db, test_user["_id"])
     assert updated_user["last_active"] > original_timestamp
+
+
+def test_update_profile(db, test_user):
+    """Test updating a user's display name."""
+    assert User.update_profile(db, test_user["_id"], display_name="New Name") is True
+
+    updated_user = User.find_one(db, test_user["_id"])
+    assert updated_user["display_name"] == "New Name"
+
+    # Nothing to change
+    assert User.update_profile(db, test_user["_id"]) is False
+
+
+def test_duplicate_email(db, test_user):
+    """Test that creating a user with a duplicate email raises an error."""
+    with pytest.raises(ValueError, match="already registered"):
+        User.create(
+            db,
+            username="someoneelse",
+            email=test_user["email"],
+            password="password123"
+        )
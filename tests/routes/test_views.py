@@ -1 +1,32 @@
 """Tests for Flask views."""
+from app.models.message import Message
+
+
+def test_index(client):
+    """Test that the landing page renders."""
+    response = client.get('/')
+
+    assert response.status_code == 200
+    assert b"I'm Drawed" in response.data
+
+
+def test_history_pages(client, db, test_user, test_artwork):
+    """Test paging through history over HTTP."""
+    for _ in range(3):
+        Message.create(db, user_id=test_user["_id"], artwork_id=test_artwork["_id"])
+
+    first = client.get('/api/history?limit=2').get_json()
+    assert len(first['messages']) == 2
+    assert first['messages'][0]['display_name'] == test_user['display_name']
+    assert first['next_cursor'] is not None
+
+    second = client.get(f"/api/history?limit=2&before={first['next_cursor']}").get_json()
+    assert len(second['messages']) == 1
+    assert second['next_cursor'] is None
+
+
+def test_history_rejects_bad_cursor(client):
+    """Test that a malformed cursor is a client error."""
+    response = client.get('/api/history?before=nonsense')
+
+    assert response.status_code == 400
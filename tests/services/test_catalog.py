@@ -0,0 +1,63 @@
+import pytest
+from bson import ObjectId
+
+from app.models.artwork import Artwork
+from app.services.catalog import ArtworkCatalog, get_catalog
+
+
+def test_cold_catalog_falls_back_to_sample(db, test_artwork):
+    """Test that a catalog with nothing loaded still returns an artwork."""
+    catalog = ArtworkCatalog(ttl=300)
+    catalog.refresh = lambda db: False  # Simulate a catalog that cannot load
+
+    artwork = catalog.random(db)
+
+    assert catalog.is_cold
+    assert artwork["_id"] == test_artwork["_id"]
+
+
+def test_random_loads_catalog_once(db):
+    """Test that the first pick loads the catalog and later picks reuse it."""
+    for i in range(3):
+        Artwork.create(db, title=f"Catalog Artwork {i}", file_path=f"/artworks/catalog_{i}.jpg")
+
+    catalog = ArtworkCatalog(ttl=300)
+    artwork = catalog.random(db)
+
+    assert len(catalog) == 3
+    assert catalog.version == 1
+    assert isinstance(artwork["_id"], ObjectId)
+
+    # A new artwork isn't visible until the TTL expires
+    Artwork.create(db, title="Late Artwork", file_path="/artworks/late.jpg")
+    catalog.random(db)
+    assert len(catalog) == 3
+    assert catalog.version == 1
+
+
+def test_invalidate_reloads_catalog(db, test_artwork):
+    """Test that an invalidated catalog picks up new artworks."""
+    catalog = ArtworkCatalog(ttl=300)
+    catalog.load(db)
+    Artwork.create(db, title="New Artwork", file_path="/artworks/new.jpg")
+
+    catalog.invalidate()
+    catalog.random(db)
+
+    assert len(catalog) == 2
+    assert catalog.version == 2
+
+
+def test_expired_catalog_reloads(db, test_artwork):
+    """Test that a zero TTL reloads the catalog on every pick."""
+    catalog = ArtworkCatalog(ttl=0)
+    catalog.random(db)
+    catalog.random(db)
+
+    assert catalog.version == 2
+
+
+def test_app_catalog_registered(app):
+    """Test that the app exposes a catalog instance."""
+    assert isinstance(get_catalog(app), ArtworkCatalog)
+    assert get_catalog(app).ttl == app.config['ARTWORK_CATALOG_TTL']
@@ -0,0 +1,64 @@
+from app.models.user import User
+from app.services.profiles import ProfileCache, get_profiles
+
+
+def test_profile_cache_hit_after_miss(db, test_user):
+    """Test that only the first lookup for a user reads the database."""
+    cache = ProfileCache(maxsize=10, ttl=60)
+
+    first = cache.get(db, str(test_user["_id"]))
+    second = cache.get(db, str(test_user["_id"]))
+
+    assert first["username"] == test_user["username"]
+    assert second["display_name"] == test_user["display_name"]
+    assert "password_hash" not in first
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_profile_cache_put_primes_entry(db, test_user):
+    """Test that a user document in hand can be cached without a read."""
+    cache = ProfileCache(maxsize=10, ttl=60)
+    cache.put(test_user)
+
+    profile = cache.get(db, test_user["_id"])
+
+    assert profile["username"] == test_user["username"]
+    assert cache.stats()["misses"] == 0
+
+
+def test_profile_cache_evicts_least_recent(db):
+    """Test that the cache never grows past maxsize."""
+    cache = ProfileCache(maxsize=2, ttl=60)
+    users = [
+        User.create(db, username=f"lru{i}", email=f"lru{i}@example.com", password="pw")
+        for i in range(3)
+    ]
+    for user in users:
+        cache.put(user)
+
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+
+    # The oldest entry was evicted, so reading it is a miss
+    cache.get(db, users[0]["_id"])
+    assert cache.stats()["misses"] == 1
+
+
+def test_profile_cache_missing_user(db):
+    """Test that an unknown user is not cached."""
+    cache = ProfileCache(maxsize=10, ttl=60)
+
+    assert cache.get(db, "0123456789ab0123456789ab") is None
+    assert len(cache) == 0
+
+
+def test_profile_change_invalidates_app_cache(app, db, test_user):
+    """Test that updating a profile drops the cached copy."""
+    cache = get_profiles(app)
+    cache.put(test_user)
+
+    User.update_profile(db, test_user["_id"], display_name="Renamed")
+    profile = cache.get(db, test_user["_id"])
+
+    assert profile["display_name"] == "Renamed"
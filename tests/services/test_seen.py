@@ -0,0 +1,40 @@
+from bson import ObjectId
+
+from app.models.message import Message
+from app.services.seen import SeenCoalescer
+
+
+def test_coalescer_dedupes_and_flushes(db, test_message, test_user):
+    """Test that repeated seen marks collapse into a single write."""
+    coalescer = SeenCoalescer(max_pending=100)
+    reader = ObjectId()
+
+    assert coalescer.add(db, test_message["_id"], reader) is True
+    assert coalescer.add(db, test_message["_id"], reader) is False
+    assert len(coalescer) == 1
+
+    assert coalescer.flush(db) == 1
+    message = Message.find_one(db, test_message["_id"])
+    assert reader in message["seen_by"]
+    assert coalescer.stats()["deduplicated"] == 1
+
+
+def test_coalescer_flushes_when_full(db, test_message):
+    """Test that reaching max_pending flushes without waiting for the timer."""
+    coalescer = SeenCoalescer(max_pending=3)
+    readers = [ObjectId() for _ in range(3)]
+    for reader in readers:
+        coalescer.add(db, test_message["_id"], reader)
+
+    assert len(coalescer) == 0
+    assert coalescer.stats()["flushes"] == 1
+    message = Message.find_one(db, test_message["_id"])
+    assert len(message["seen_by"]) == 4
+
+
+def test_coalescer_ignores_invalid_ids(db):
+    """Test that malformed message IDs from clients are dropped."""
+    coalescer = SeenCoalescer()
+
+    assert coalescer.add(db, "not-an-id", ObjectId()) is False
+    assert len(coalescer) == 0
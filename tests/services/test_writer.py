@@ -0,0 +1,41 @@
+from pymongo import UpdateOne
+
+from app.services.writer import BulkWriter
+
+
+def _touch(key):
+    return UpdateOne({'_id': key}, {'$set': {'touched': True}}, upsert=True)
+
+
+def test_bulk_writer_dedupes_pending_writes(db):
+    """Test that repeated keys collapse into one pending operation."""
+    writer = BulkWriter('scratch', max_batch=10)
+    assert writer.add(db, 'a', _touch('a')) is True
+    assert writer.add(db, 'a', _touch('a')) is False
+    writer.add(db, 'b', _touch('b'))
+
+    assert len(writer) == 2
+    assert writer.flush(db) == 2
+    assert db.scratch.count_documents({}) == 2
+    assert writer.stats()['deduplicated'] == 1
+    db.scratch.drop()
+
+
+def test_bulk_writer_flushes_full_batch(db):
+    """Test that reaching max_batch flushes without waiting for the timer."""
+    writer = BulkWriter('scratch', max_batch=3)
+    for key in range(3):
+        writer.add(db, key, _touch(key))
+
+    assert len(writer) == 0
+    assert writer.stats()['flushes'] == 1
+    assert db.scratch.count_documents({}) == 3
+    db.scratch.drop()
+
+
+def test_bulk_writer_flush_empty(db):
+    """Test that flushing with nothing pending is a no-op."""
+    writer = BulkWriter('scratch')
+
+    assert writer.flush(db) == 0
+    assert writer.stats()['flushes'] == 0
@@ -1 +1,99 @@
 """Tests for WebSocket events."""
+import pytest
+
+from app import socketio
+from app.services.guests import get_guests
+from app.services.profiles import get_profiles
+from app.services.seen import get_seen
+
+
+@pytest.fixture
+def socket_client(app, client):
+    """A Socket.IO test client sharing the Flask test client's cookies."""
+    socket_client = socketio.test_client(app, flask_test_client=client)
+    yield socket_client
+    if socket_client.is_connected():
+        socket_client.disconnect()
+
+
+def test_connect_sends_status(socket_client):
+    """Test that connecting emits a status event."""
+    received = socket_client.get_received()
+
+    assert socket_client.is_connected()
+    assert any(event["name"] == "status" for event in received)
+
+
+def test_send_art_broadcasts_new_art(app, socket_client, test_artwork):
+    """Test that send_art broadcasts the artwork with the sender's profile."""
+    socket_client.get_received()
+    socket_client.emit("send_art", {})
+    socket_client.emit("send_art", {})
+
+    events = [e for e in socket_client.get_received() if e["name"] == "new_art"]
+    assert len(events) == 2
+    payload = events[0]["args"][0]
+    assert payload["artwork"]["title"] == test_artwork["title"]
+    assert payload["display_name"] == "Guest User"
+
+    # The sender's profile is cached from connect, so no user reads happen
+    assert get_profiles(app).stats()["misses"] == 0
+
+
+def test_connect_does_not_write_guest(app, db, socket_client):
+    """Test that an anonymous connect allocates a guest without any writes."""
+    status = [e for e in socket_client.get_received() if e["name"] == "status"][0]
+
+    assert "guest_token" in status["args"][0]
+    assert db.users.count_documents({}) == 0
+
+
+def test_guest_token_keeps_identity(app, client):
+    """Test that reconnecting with a guest token reuses the same guest id."""
+    first = socketio.test_client(app)
+    token = first.get_received()[0]["args"][0]["guest_token"]
+    first.emit("send_art", {})
+    first.disconnect()
+
+    second = socketio.test_client(app, auth={"guest_token": token})
+    second_token = second.get_received()[0]["args"][0]["guest_token"]
+    second.disconnect()
+
+    guests = get_guests(app)
+    assert guests.load(second_token) == guests.load(token)
+
+
+def test_guest_saved_on_first_send_art(app, db, socket_client, test_artwork):
+    """Test that a guest's user document is written in bulk after sending art."""
+    socket_client.emit("send_art", {})
+    socket_client.emit("send_art", {})
+    get_guests(app).writer.flush(db)
+
+    guests = list(db.users.find({"guest": True}))
+    assert len(guests) == 1
+    assert "password_hash" not in guests[0]
+    assert db.messages.find_one()["user_id"] == guests[0]["_id"]
+
+
+def test_mark_seen_batch_is_coalesced(app, db, socket_client, test_message):
+    """Test that mark_seen_batch queues marks instead of writing each one."""
+    socket_client.emit("mark_seen_batch", {"message_ids": [str(test_message["_id"])] * 3})
+    socket_client.emit("mark_seen", {"message_id": str(test_message["_id"])})
+
+    seen = get_seen(app)
+    assert len(seen) == 1
+    seen.flush(db)
+
+    message = db.messages.find_one({"_id": test_message["_id"]})
+    assert len(message["seen_by"]) == 2
+
+
+def test_get_history(socket_client, test_message):
+    """Test that get_history answers with a page of messages."""
+    socket_client.get_received()
+    socket_client.emit("get_history", {"limit": 10})
+
+    history = [e for e in socket_client.get_received() if e["name"] == "history"][0]
+    page = history["args"][0]
+    assert [m["message_id"] for m in page["messages"]] == [str(test_message["_id"])]
+    assert page["next_cursor"] is None
@@ -0,0 +1,82 @@
+"""Tests for the MongoDB-backed Socket.IO client manager."""
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.sockets.manager import MongoManager
+
+
+@pytest.fixture
+def manager(app, db):
+    """A manager using a scratch channel in the test database."""
+    manager = MongoManager(
+        app.config['MONGO_URI'],
+        channel='socketio_test',
+        batch_size=3,
+        batch_interval=60,
+        node_id='test-node',
+        client=db.client
+    )
+    yield manager
+    db.drop_collection('socketio_test')
+    db.drop_collection('socketio_test.cursors')
+
+
+def _emit_message(event):
+    return {'method': 'emit', 'event': event, 'data': {}, 'namespace': '/',
+            'room': 'main_room', 'skip_sid': None, 'callback': None,
+            'host_id': 'other-host'}
+
+
+def test_publishes_are_batched(manager, db):
+    """Test that several publishes are written as one document."""
+    for i in range(3):
+        manager._publish(_emit_message(f"event_{i}"))
+
+    documents = list(db.socketio_test.find())
+    assert len(documents) == 1
+    assert len(documents[0]['messages']) == 3
+    assert manager.stats['published'] == 3
+    assert manager.stats['publish_batches'] == 1
+
+
+def test_flush_writes_partial_batch(manager, db):
+    """Test that a flush sends whatever is queued."""
+    manager._publish(_emit_message("lonely"))
+
+    assert db.socketio_test.count_documents({}) == 0
+    assert manager._flush() == 1
+    assert db.socketio_test.count_documents({}) == 1
+
+
+def test_listen_resumes_from_checkpoint(manager, db):
+    """Test that a restarted listener delivers batches after its checkpoint."""
+    manager._ensure_collection()
+    published_before = datetime.utcnow() - timedelta(seconds=1)
+    db['socketio_test.cursors'].insert_one({
+        '_id': 'test-node',
+        'last_id': ObjectId.from_datetime(published_before),
+        'last_ts': published_before,
+        'updated_at': datetime.utcnow()
+    })
+    manager._publish(_emit_message("missed"))
+    manager._flush()
+
+    message = next(manager._listen())
+
+    assert message['event'] == "missed"
+    assert manager.stats['received'] == 1
+    assert manager.stats['lag_ms_last'] is not None
+
+
+def test_stale_checkpoint_is_ignored(manager, db):
+    """Test that an old checkpoint doesn't replay stale broadcasts."""
+    db['socketio_test.cursors'].insert_one({
+        '_id': 'test-node',
+        'last_id': ObjectId(),
+        'last_ts': datetime.utcnow(),
+        'updated_at': datetime.utcnow() - timedelta(minutes=5)
+    })
+
+    assert manager._load_checkpoint() == (None, None)